@@ -56,6 +56,7 @@ class AIDetectionEngine {
             const configUrl = chrome.runtime.getURL('models/config.json');
             const response = await fetch(configUrl);
             this.config = await response.json();
+            this.expandIdentityLabels();
         } catch (error) {
             console.error('Failed to load model configuration:', error);
             // Use fallback config
@@ -63,13 +64,26 @@ class AIDetectionEngine {
         }
     }
 
+    expandIdentityLabels() {
+        // config.json stores self-mapping labels as a compact identity list
+        const labels = this.config?.labels;
+        if (!labels || !labels.identity) {
+            return;
+        }
+        labels.challenge_alias = labels.challenge_alias || {};
+        for (const label of labels.identity) {
+            labels.challenge_alias[label] = label;
+        }
+    }
+
     getFallbackConfig() {
         return {
             models: {
                 yolo: { path: "models/yolo11m-seg.onnx", input_size: [640, 640] },
                 clip_vision: { path: "models/clip_vision_encoder.onnx", input_size: [224, 224] },
                 clip_text: { path: "models/clip_text_encoder.onnx", vocab_size: 49408 },
-                clipseg: { path: "models/clipseg.onnx", input_size: [352, 352] }
+                clipseg_vision: { path: "models/clipseg_vision.onnx", input_size: [352, 352] },
+                clipseg_conditional: { path: "models/clipseg_conditional.onnx" }
             },
             labels: {
                 challenge_alias: {
@@ -204,8 +218,7 @@ class AIDetectionEngine {
                 results = await this.clipClassifyImages(images, taskType, clipVisionModel, clipTextModel);
             } else {
                 // Area detection mode - use CLIPSeg
-                const clipsegModel = await this.loadModel('clipseg');
-                results = await this.clipSegmentArea(images, taskType, clipsegModel);
+                results = await this.clipSegmentArea(images, taskType);
             }
             
             return {
@@ -314,7 +327,7 @@ class AIDetectionEngine {
                 for (let i = 0; i < scores.length; i++) {
                     if (scores[i] > 0.5) { // Confidence threshold
                         const classId = Math.round(classes[i]);
-                        const className = this.config.models.yolo.classes[classId];
+                        const className = this.getYoloClasses()[classId];
                         
                         if (this.matchesTaskType(className, taskType)) {
                             // Calculate which tiles this detection covers
@@ -378,20 +391,21 @@ class AIDetectionEngine {
         };
     }
 
-    async clipSegmentArea(images, taskType, clipsegModel) {
+    async clipSegmentArea(images, taskType) {
         // Combine images into grid if multiple
         let inputImage = images.length === 1 ? images[0].dataUrl : this.createImageGrid(images);
-        
-        // Preprocess for CLIPSeg
-        const imageTensor = await this.preprocessImageForClip(inputImage, [352, 352]);
+
+        // Run the vision backbone once per image (cached across prompts)
+        const visionOutputs = await this.getClipSegVisionOutputs(inputImage);
         const textInputs = this.createTextInputs([taskType]);
-        
-        // Run CLIPSeg inference
-        const results = await clipsegModel.run({
-            pixel_values: imageTensor,
-            ...textInputs
+
+        // Run the small conditional head for this prompt
+        const conditionalModel = await this.loadModel('clipseg_conditional');
+        const results = await conditionalModel.run({
+            ...textInputs,
+            ...visionOutputs
         });
-        
+
         // Process segmentation results
         const logits = results.logits;
         const response = this.processSegmentationMask(logits.data, images.length);
@@ -404,6 +418,32 @@ class AIDetectionEngine {
         };
     }
 
+    getYoloClasses() {
+        // config.json ships the class list NUL-joined and base64-packed;
+        // decode on first use and memoize the array
+        if (this.yoloClasses) {
+            return this.yoloClasses;
+        }
+        const yolo = this.config.models.yolo;
+        this.yoloClasses = yolo.classes_b64 ? atob(yolo.classes_b64).split('\0') : (yolo.classes || []);
+        return this.yoloClasses;
+    }
+
+    async getClipSegVisionOutputs(inputImage) {
+        // The vision forward dominates CLIPSeg cost; cache its activations so
+        // repeated prompts on the same image only pay for the conditional head
+        if (this.clipsegVisionCache && this.clipsegVisionCache.key === inputImage) {
+            return this.clipsegVisionCache.outputs;
+        }
+
+        const visionModel = await this.loadModel('clipseg_vision');
+        const imageTensor = await this.preprocessImageForClip(inputImage, [352, 352]);
+        const outputs = await visionModel.run({ pixel_values: imageTensor });
+
+        this.clipsegVisionCache = { key: inputImage, outputs };
+        return outputs;
+    }
+
     createTextInputs(texts) {
         // Simplified tokenization - in real implementation, you'd need proper tokenization
         const inputIds = [];
@@ -86,7 +86,7 @@ def validate_model_config():
                 print(f"✗ Missing section in config: {section}")
                 return False
         
-        required_models = ['yolo', 'clip_vision', 'clip_text', 'clipseg']
+        required_models = ['yolo', 'clip_vision', 'clip_text', 'clipseg_vision', 'clipseg_conditional']
         for model in required_models:
             if model not in config['models']:
                 print(f"✗ Missing model config: {model}")
@@ -109,9 +109,10 @@ def create_dummy_models():
     # In real usage, these would be generated by convert_models.py
     dummy_models = [
         'yolo11m-seg.onnx',
-        'clip_vision_encoder.onnx', 
+        'clip_vision_encoder.onnx',
         'clip_text_encoder.onnx',
-        'clipseg.onnx'
+        'clipseg_vision.onnx',
+        'clipseg_conditional.onnx'
     ]
     
     created = []